@@ -40,9 +40,151 @@ class AnalysisService:
         return df_prevision, rmse
 
     @staticmethod
-    def calculer_erreurs_prevision(df_prevision):
+    def _reponses_lineaires(F, g, x0, m):
+        """Calcule les réponses impulsionnelle c F^j g et libre c F^j x0 d'un lissage linéaire
+
+        Le lissage suit x_t = F x_{t-1} + g y_t et prévoit y_{t+1} par la somme des états.
+        Les puissances de F sont obtenues par doublement, vectorisé sur la grille, et arrêtées
+        dès que F^K devient négligeable (F est stable) : les réponses ont la forme (G, K)
+        avec K de l'ordre de quelques centaines, indépendamment de la longueur m de la série.
+        """
+        G, d = g.shape
+
+        # V[:, j] = F^j [g, x0]
+        V = np.empty((G, 1, d, 2))
+        V[:, 0, :, 0] = g
+        V[:, 0, :, 1] = x0
+        puissance = F
+        while V.shape[1] < m and np.abs(puissance).max() > np.finfo(np.float64).eps:
+            V = np.concatenate([V, puissance[:, None] @ V], axis=1)
+            puissance = puissance @ puissance
+
+        V = V[:, :m]
+        return V[..., 0].sum(axis=2), V[..., 1].sum(axis=2)
+
+    @staticmethod
+    def _iterer_previsions(y, reponse, libre, taille_bloc=4096):
+        """Produit les prévisions à un pas de y[1:] par blocs de temps (overlap-save)
+
+        Pour chaque bloc [debut, fin[ de la série z = y[1:], la réponse impulsionnelle
+        tronquée est convoluée par FFT avec les K valeurs qui précèdent le bloc et le bloc
+        lui-même ; la mémoire reste en O(G·(K + taille_bloc)) quelle que soit la longueur.
+        Produit des couples (debut, previsions) où previsions a la forme (G, fin - debut).
+        """
+        z = np.asarray(y[1:], dtype=np.float64)
+        m = len(z)
+        K = reponse.shape[1]
+
+        # La prévision de z[i] combine z[i-1], ..., z[i-K] : noyau décalé d'un pas
+        # Taille suffisante pour une convolution linéaire (sans repliement) d'un segment de taille_bloc + K valeurs
+        n_fft = 1 << int(taille_bloc + 2 * K).bit_length()
+        noyau = np.fft.rfft(np.pad(reponse, ((0, 0), (1, 0))), n_fft)
+
+        for debut in range(0, m, taille_bloc):
+            fin = min(debut + taille_bloc, m)
+            amont = max(0, debut - K)
+            convolution = np.fft.irfft(noyau * np.fft.rfft(z[amont:fin], n_fft), n_fft)
+            previsions = convolution[:, debut - amont:fin - amont]
+            if debut < K:
+                previsions[:, :K - debut] += libre[:, debut:min(fin, K)]
+            yield debut, previsions
+
+    @staticmethod
+    def _retenir_meilleure(df, F, g, x0, colonne, parametres):
+        """Évalue toute la grille, garde la ligne de plus faible RMSE et construit le DataFrame de prévision
+
+        Seules les sommes d'erreurs au carré sont conservées par point de la grille ; les
+        prévisions complètes ne sont recalculées que pour les paramètres retenus.
+        """
+        y = df['EUR_USD'].to_numpy(dtype=np.float64)
+        reel = y[1:]
+
+        reponse, libre = AnalysisService._reponses_lineaires(F, g, x0, len(reel))
+        sce = np.zeros(len(g))
+        for debut, previsions in AnalysisService._iterer_previsions(y, reponse, libre):
+            sce += ((previsions - reel[debut:debut + previsions.shape[1]]) ** 2).sum(axis=1)
+        meilleur = int(np.argmin(sce))
+
+        meilleures = np.concatenate([
+            previsions[0] for _, previsions in AnalysisService._iterer_previsions(
+                y, reponse[meilleur:meilleur + 1], libre[meilleur:meilleur + 1]
+            )
+        ])
+
+        df_prevision = df.iloc[1:].copy()
+        df_prevision[colonne] = meilleures
+        df_prevision.attrs['parametres'] = {nom: float(valeurs[meilleur]) for nom, valeurs in parametres.items()}
+
+        return df_prevision, float(np.sqrt(sce[meilleur] / len(reel)))
+
+    @staticmethod
+    def prevision_lissage_exponentiel(df, alphas=None):
+        """Prévision par lissage exponentiel simple, alpha choisi sur une grille
+
+        Toutes les valeurs d'alpha sont évaluées en une seule opération matricielle ; l'alpha
+        retenu est disponible dans df_prevision.attrs['parametres'].
+        """
+        alphas = np.linspace(0.05, 0.95, 19) if alphas is None else np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+        y = df['EUR_USD'].to_numpy(dtype=np.float64)
+
+        F = (1 - alphas)[:, None, None]
+        g = alphas[:, None]
+        return AnalysisService._retenir_meilleure(df, F, g, np.array([y[0]]), 'Prevision_SES', {'alpha': alphas})
+
+    @staticmethod
+    def prevision_holt(df, alphas=None, betas=None):
+        """Prévision par lissage exponentiel double de Holt (niveau + tendance)
+
+        La grille alpha x beta est évaluée en une seule opération matricielle ; les paramètres
+        retenus sont disponibles dans df_prevision.attrs['parametres'].
+        """
+        alphas = np.linspace(0.1, 0.9, 9) if alphas is None else np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+        betas = np.linspace(0.05, 0.5, 10) if betas is None else np.atleast_1d(np.asarray(betas, dtype=np.float64))
+        a, b = (grille.ravel() for grille in np.meshgrid(alphas, betas, indexing='ij'))
+        y = df['EUR_USD'].to_numpy(dtype=np.float64)
+
+        # Niveau l_t = a y_t + (1-a)(l_{t-1} + b_{t-1}), tendance b_t = beta (l_t - l_{t-1}) + (1-beta) b_{t-1}
+        F = np.empty((len(a), 2, 2))
+        F[:, 0, 0] = 1 - a
+        F[:, 0, 1] = 1 - a
+        F[:, 1, 0] = -a * b
+        F[:, 1, 1] = 1 - a * b
+        g = np.stack([a, a * b], axis=1)
+        return AnalysisService._retenir_meilleure(
+            df, F, g, np.array([y[0], 0.0]), 'Prevision_Holt', {'alpha': a, 'beta': b}
+        )
+
+    @staticmethod
+    def prevision_ar(df, ordre=1):
+        """Prévision autorégressive AR(p) ajustée par moindres carrés
+
+        Les coefficients (constante puis retards 1..p) sont disponibles dans
+        df_prevision.attrs['parametres'].
+        """
+        y = df['EUR_USD'].to_numpy(dtype=np.float64)
+        if len(y) <= ordre + 1:
+            raise ValueError(f"Au moins {ordre + 2} observations sont nécessaires pour un AR({ordre})")
+
+        # Ligne t de la matrice : [1, y_{t-1}, ..., y_{t-p}]
+        retards = np.lib.stride_tricks.sliding_window_view(y[:-1], ordre)[:, ::-1]
+        X = np.column_stack([np.ones(len(retards)), retards])
+        coefficients, *_ = np.linalg.lstsq(X, y[ordre:], rcond=None)
+
+        df_prevision = df.iloc[ordre:].copy()
+        df_prevision['Prevision_AR'] = X @ coefficients
+        df_prevision.attrs['parametres'] = {'constante': float(coefficients[0])}
+        df_prevision.attrs['parametres'].update(
+            {f'phi_{i}': float(c) for i, c in enumerate(coefficients[1:], start=1)}
+        )
+
+        rmse = np.sqrt(mean_squared_error(df_prevision['EUR_USD'], df_prevision['Prevision_AR']))
+
+        return df_prevision, rmse
+
+    @staticmethod
+    def calculer_erreurs_prevision(df_prevision, colonne='Prevision_Naive'):
         """Calcule les métriques d'erreur de prévision"""
-        erreurs = df_prevision['EUR_USD'] - df_prevision['Prevision_Naive']
+        erreurs = df_prevision['EUR_USD'] - df_prevision[colonne]
         
         metriques = {
             'Erreur_Absolue_Moyenne': np.abs(erreurs).mean(),
@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime, timedelta
 import streamlit as st
 import os
+from rattrapage_historique import RattrapageHistorique
+from registre_fournisseurs import AucunFournisseurDisponible, obtenir_registre_fournisseurs
+from registre_donnees import obtenir_registre
 
 class DataService:
     """Service pour gérer les données de change EUR/USD"""
@@ -15,79 +17,30 @@ class DataService:
         date_fin = datetime.now()
         date_debut = date_fin - timedelta(days=730)  # 2 ans
         
-        # APIs fonctionnelles sans clé requise
-        apis = [
-            {
-                'nom': 'ExchangeRate-API (Accès libre)',
-                'methode': 'taux_unique',
-                'url': 'https://api.exchangerate-api.com/v4/latest/EUR'
-            },
-            {
-                'nom': 'Currency API (Fawazahmed0)',
-                'methode': 'api_devise',
-                'url': 'https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies/eur.json'
-            },
-            {
-                'nom': 'FreeForexAPI',
-                'methode': 'api_forex',
-                'url': 'https://www.freeforexapi.com/api/live',
-                'params': {'pairs': 'EURUSD'}
-            }
-        ]
-        
-        for api in apis:
-            try:
-                st.info(f"Tentative avec l'API {api['nom']}...")
-                
-                if api['methode'] == 'taux_unique':
-                    # Récupère le taux actuel depuis ExchangeRate-API
-                    response = requests.get(api['url'], timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'rates' in data and 'USD' in data['rates']:
-                        taux_actuel = data['rates']['USD']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataService._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        st.success(f"Taux actuel: {taux_actuel:.4f} - Données historiques générées")
-                        return df
-                        
-                elif api['methode'] == 'api_devise':
-                    # Récupère le taux actuel depuis Currency API
-                    response = requests.get(api['url'], timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'eur' in data and 'usd' in data['eur']:
-                        taux_actuel = data['eur']['usd']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataService._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        st.success(f"Taux actuel: {taux_actuel:.4f} - Données historiques générées")
-                        return df
-                        
-                elif api['methode'] == 'api_forex':
-                    # Récupère le taux actuel depuis FreeForexAPI
-                    response = requests.get(api['url'], params=api.get('params', {}), timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'rates' in data and 'EURUSD' in data['rates']:
-                        taux_actuel = data['rates']['EURUSD']['rate']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataService._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        st.success(f"Taux actuel: {taux_actuel:.4f} - Données historiques générées")
-                        return df
-                        
-            except Exception as e:
-                st.warning(f"Échec avec l'API {api['nom']}: {e}")
-                continue
-        
-        # Si toutes les APIs échouent, génère des données d'exemple
-        st.warning("Toutes les APIs ont échoué. Génération de données d'exemple...")
-        return DataService._generer_donnees_exemple()
+        # Historique réel en priorité, rattrapé par blocs avec reprise (voir rattrapage_historique)
+        rapport = RattrapageHistorique().executer(date_debut.date(), date_fin.date(), 'eur_usd.csv')
+        if rapport['Lignes']:
+            for bloc, erreur in rapport['Echecs'].items():
+                st.warning(f"Bloc {bloc} non téléchargé: {erreur} - relancer rattrapage_historique.py pour compléter")
+            st.success(f"Historique réel téléchargé: {rapport['Lignes']} jours")
+            return pd.read_csv('eur_usd.csv', index_col=0, parse_dates=True)
+        
+        # Sinon, les fournisseurs de taux actuel sont essayés du plus sain au moins sain (voir registre_fournisseurs)
+        registre = obtenir_registre_fournisseurs()
+        try:
+            taux_actuel, nom = registre.obtenir_taux()
+        except AucunFournisseurDisponible as e:
+            for nom, erreur in e.erreurs.items():
+                st.warning(f"Échec avec l'API {nom}: {erreur}")
+            # Si toutes les APIs échouent, génère des données d'exemple
+            st.warning("Toutes les APIs ont échoué. Génération de données d'exemple...")
+            return DataService._generer_donnees_exemple()
+        
+        # Génère les données historiques basées sur le taux actuel
+        df = DataService._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
+        df.to_csv('eur_usd.csv')
+        st.success(f"Taux actuel ({nom}): {taux_actuel:.4f} - Données historiques générées")
+        return df
 
     @staticmethod
     def _generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin):
@@ -157,29 +110,20 @@ class DataService:
         return df
 
     @staticmethod
-    @st.cache_data
     def charger_et_preparer_donnees():
-        """Charge les données depuis le CSV et les prépare pour l'analyse"""
+        """Charge les données depuis le CSV et les prépare pour l'analyse
+
+        Les données sont servies par le registre du processus : elles sont chargées une seule
+        fois pour toutes les sessions et rechargées automatiquement si eur_usd.csv change.
+        """
         try:
-            # Essaie de charger le CSV existant d'abord
-            if os.path.exists('eur_usd.csv'):
-                df = pd.read_csv('eur_usd.csv', index_col=0, parse_dates=True)
-            else:
+            # Télécharge les données uniquement si le CSV n'existe pas encore
+            if not os.path.exists('eur_usd.csv'):
                 df = DataService.telecharger_donnees_eur_usd()
                 if df is None:
                     return None
             
-            # Convertit en index datetime approprié
-            df.index = pd.to_datetime(df.index)
-            df = df.sort_index()
-            
-            # Gère les valeurs manquantes - propagation vers l'avant pour week-ends/jours fériés
-            df = df.ffill()
-            
-            # Supprime toutes les valeurs NaN restantes
-            df = df.dropna()
-            
-            return df
+            return obtenir_registre('eur_usd.csv').dataframe()
         except Exception as e:
             st.error(f"Erreur lors du chargement des données: {e}")
             return None
\ No newline at end of file
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime, timedelta
 import os
+from rattrapage_historique import RattrapageHistorique
+from registre_donnees import RegistreDonnees
+from registre_fournisseurs import AucunFournisseurDisponible, obtenir_registre_fournisseurs
 
 class DataServiceCore:
     """Service pour gérer les données de change EUR/USD - Version sans Streamlit pour les tests"""
@@ -13,72 +15,23 @@ class DataServiceCore:
         date_fin = datetime.now()
         date_debut = date_fin - timedelta(days=730)  # 2 ans
         
-        # APIs fonctionnelles sans clé requise
-        apis = [
-            {
-                'nom': 'ExchangeRate-API (Accès libre)',
-                'methode': 'taux_unique',
-                'url': 'https://api.exchangerate-api.com/v4/latest/EUR'
-            },
-            {
-                'nom': 'Currency API (Fawazahmed0)',
-                'methode': 'api_devise',
-                'url': 'https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies/eur.json'
-            },
-            {
-                'nom': 'FreeForexAPI',
-                'methode': 'api_forex',
-                'url': 'https://www.freeforexapi.com/api/live',
-                'params': {'pairs': 'EURUSD'}
-            }
-        ]
-        
-        for api in apis:
-            try:
-                if api['methode'] == 'taux_unique':
-                    # Récupère le taux actuel depuis ExchangeRate-API
-                    response = requests.get(api['url'], timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'rates' in data and 'USD' in data['rates']:
-                        taux_actuel = data['rates']['USD']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataServiceCore._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        return df
-                        
-                elif api['methode'] == 'api_devise':
-                    # Récupère le taux actuel depuis Currency API
-                    response = requests.get(api['url'], timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'eur' in data and 'usd' in data['eur']:
-                        taux_actuel = data['eur']['usd']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataServiceCore._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        return df
-                        
-                elif api['methode'] == 'api_forex':
-                    # Récupère le taux actuel depuis FreeForexAPI
-                    response = requests.get(api['url'], params=api.get('params', {}), timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'rates' in data and 'EURUSD' in data['rates']:
-                        taux_actuel = data['rates']['EURUSD']['rate']
-                        # Génère les données historiques basées sur le taux actuel
-                        df = DataServiceCore._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
-                        df.to_csv('eur_usd.csv')
-                        return df
-                        
-            except Exception as e:
-                continue
-        
-        # Si toutes les APIs échouent, génère des données d'exemple
-        return DataServiceCore._generer_donnees_exemple()
+        # Historique réel en priorité, rattrapé par blocs avec reprise (voir rattrapage_historique)
+        rapport = RattrapageHistorique().executer(date_debut.date(), date_fin.date(), 'eur_usd.csv')
+        if rapport['Lignes']:
+            return pd.read_csv('eur_usd.csv', index_col=0, parse_dates=True)
+        
+        # Sinon, les fournisseurs de taux actuel sont essayés du plus sain au moins sain (voir registre_fournisseurs)
+        registre = obtenir_registre_fournisseurs()
+        try:
+            taux_actuel, _ = registre.obtenir_taux()
+        except AucunFournisseurDisponible:
+            # Si toutes les APIs échouent, génère des données d'exemple
+            return DataServiceCore._generer_donnees_exemple()
+        
+        # Génère les données historiques basées sur le taux actuel
+        df = DataServiceCore._generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin)
+        df.to_csv('eur_usd.csv')
+        return df
 
     @staticmethod
     def _generer_historique_depuis_taux_actuel(taux_actuel, date_debut, date_fin):
@@ -157,16 +110,7 @@ class DataServiceCore:
                 if df is None:
                     return None
             
-            # Convertit en index datetime approprié
-            df.index = pd.to_datetime(df.index)
-            df = df.sort_index()
-            
-            # Gère les valeurs manquantes - propagation vers l'avant pour week-ends/jours fériés
-            df = df.ffill()
-            
-            # Supprime toutes les valeurs NaN restantes
-            df = df.dropna()
-            
-            return df
+            # Même préparation que le registre partagé : tri, propagation et suppression des NaN
+            return RegistreDonnees.preparer_donnees(df)
         except Exception as e:
             return None
\ No newline at end of file
@@ -1,8 +1,11 @@
 import streamlit as st
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from data_service import DataService
 from analysis_service import AnalysisService
+from registre_fournisseurs import obtenir_registre_fournisseurs
+from export_donnees import ExportService, FORMATS_EXPORT
 
 st.set_page_config(page_title="Analyse des Taux EUR/USD", layout="wide")
 
@@ -45,6 +48,9 @@ def main():
         st.metric("Taux actuel", f"{df['EUR_USD'].iloc[-1]:.4f}")
         st.metric("Source des données", "API de taux de change")
     
+    with st.expander("Santé des fournisseurs de taux"):
+        st.dataframe(pd.DataFrame(obtenir_registre_fournisseurs().metriques()).T)
+    
     # Affichage des données brutes
     if st.checkbox("Afficher les données brutes"):
         st.dataframe(df.head(10))
@@ -84,13 +90,39 @@ def main():
     fig_returns.update_layout(xaxis_title="Date", yaxis_title="Rendement Journalier (%)")
     st.plotly_chart(fig_returns, use_container_width=True)
     
-    # Section 3: Prévision naïve
-    st.header("3️⃣ Prévision Naïve")
-    st.markdown("🔮 **Principe:** La valeur de demain = valeur d'aujourd'hui")
-    
-    df_prevision, rmse = AnalysisService.prevision_naive(df)
+    # Section 3: Prévision
+    st.header("3️⃣ Prévision")
+    
+    # Modèle -> (fonction de prévision, colonne de prévision, principe)
+    modeles = {
+        "Prévision Naïve": (
+            AnalysisService.prevision_naive, 'Prevision_Naive',
+            "La valeur de demain = valeur d'aujourd'hui"
+        ),
+        "Lissage Exponentiel Simple": (
+            AnalysisService.prevision_lissage_exponentiel, 'Prevision_SES',
+            "Moyenne pondérée des valeurs passées, les poids décroissant exponentiellement (alpha choisi par RMSE)"
+        ),
+        "Lissage de Holt": (
+            AnalysisService.prevision_holt, 'Prevision_Holt',
+            "Lissage exponentiel d'un niveau et d'une tendance : demain = niveau + tendance (alpha, beta choisis par RMSE)"
+        ),
+        "Autorégressif AR(3)": (
+            lambda d: AnalysisService.prevision_ar(d, ordre=3), 'Prevision_AR',
+            "Demain = constante + combinaison linéaire des 3 dernières valeurs (moindres carrés)"
+        ),
+    }
+    nom_modele = st.selectbox("Modèle de prévision", list(modeles))
+    prevoir, colonne_prevision, principe = modeles[nom_modele]
+    st.markdown(f"🔮 **Principe ({nom_modele}):** {principe}")
+    
+    df_prevision, rmse = prevoir(df)
     
     st.metric("Erreur Quadratique Moyenne (RMSE)", f"{rmse:.6f}")
+    if df_prevision.attrs.get('parametres'):
+        st.caption("Paramètres retenus : " + ", ".join(
+            f"{nom} = {valeur:.4f}" for nom, valeur in df_prevision.attrs['parametres'].items()
+        ))
     
     # Graphique réel vs prévision pour les 30 derniers jours
     derniers_30_jours = df_prevision.tail(30)
@@ -105,14 +137,14 @@ def main():
     ))
     fig_prevision.add_trace(go.Scatter(
         x=derniers_30_jours.index,
-        y=derniers_30_jours['Prevision_Naive'],
+        y=derniers_30_jours[colonne_prevision],
         mode='lines+markers',
-        name='Prévision Naïve',
+        name=nom_modele,
         line=dict(color='red', dash='dash')
     ))
     
     fig_prevision.update_layout(
-        title="Réel vs Prévision Naïve (30 Derniers Jours)",
+        title=f"Réel vs {nom_modele} (30 Derniers Jours)",
         xaxis_title="Date",
         yaxis_title="Taux EUR/USD"
     )
@@ -120,7 +152,7 @@ def main():
     
     # Analyse des erreurs
     st.subheader("Analyse des Erreurs de Prévision")
-    metriques_erreur = AnalysisService.calculer_erreurs_prevision(df_prevision)
+    metriques_erreur = AnalysisService.calculer_erreurs_prevision(df_prevision, colonne_prevision)
     
     col1, col2 = st.columns(2)
     with col1:
@@ -134,14 +166,37 @@ def main():
     # Section téléchargement
     st.header("💾 Télécharger les Données")
     st.markdown("💿 **Fichier CSV généré automatiquement:** `eur_usd.csv`")
-    if st.button("Télécharger les données EUR/USD en CSV"):
-        csv = df.to_csv()
-        st.download_button(
-            label="Télécharger CSV",
-            data=csv,
-            file_name="analyse_eur_usd.csv",
-            mime="text/csv"
-        )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        format_export = st.selectbox("Format d'export", list(FORMATS_EXPORT))
+    with col2:
+        periode = st.date_input("Période", (df.index.min().date(), df.index.max().date()))
+    with col3:
+        colonnes = st.multiselect("Colonnes", list(df.columns), default=list(df.columns))
+    
+    if st.button("Préparer l'export des données EUR/USD"):
+        # Export par blocs vers un fichier temporaire : pas de copie complète en mémoire
+        debut, fin = (periode[0], periode[-1]) if periode else (None, None)
+        extension, mime = FORMATS_EXPORT[format_export]
+        try:
+            fichier = ExportService.exporter_vers_fichier_temporaire(
+                df, format_export, debut=debut, fin=fin, colonnes=colonnes
+            )
+        except ImportError as e:
+            st.error(str(e))
+        except (KeyError, ValueError) as e:
+            # Colonne inconnue, période invalide ou schéma incohérent entre blocs (ArrowInvalid)
+            st.error(f"Export impossible: {e}")
+        else:
+            # Streamlit sert le contenu depuis la mémoire : seul le fichier compressé y est chargé
+            with fichier:
+                donnees = fichier.read()
+            st.download_button(
+                label=f"Télécharger ({format_export})",
+                data=donnees,
+                file_name=f"analyse_eur_usd.{extension}",
+                mime=mime
+            )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
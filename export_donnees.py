@@ -0,0 +1,174 @@
+import argparse
+import gzip
+import io
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow est installé avec streamlit
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Format -> (extension, type MIME)
+FORMATS_EXPORT = {
+    'csv.gz': ('csv.gz', 'application/gzip'),
+    'csv.zst': ('csv.zst', 'application/zstd'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+class ExportService:
+    """Export des données par blocs, pour que la mémoire reste bornée quelle que soit la taille
+
+    La source est un DataFrame ou un chemin de CSV (lu par blocs avec pandas). Chaque bloc
+    est écrit puis libéré : en CSV compressé (gzip ou zstd), en Parquet (un groupe de lignes
+    par bloc) ou en Arrow IPC (un lot par bloc).
+    """
+
+    @staticmethod
+    def _bornes(debut, fin):
+        """Convertit la période en bornes [debut, fin[ ; une date de fin sans heure inclut toute la journée"""
+        debut = pd.Timestamp(debut) if debut is not None else None
+        if fin is not None:
+            fin = pd.Timestamp(fin)
+            fin = fin + pd.Timedelta(days=1) if fin == fin.normalize() else fin + pd.Timedelta(1, 'ns')
+        return debut, fin
+
+    @staticmethod
+    def iterer_blocs(source, debut=None, fin=None, colonnes=None, taille_bloc=100_000):
+        """Produit les blocs de la source filtrés par période et colonnes
+
+        Le premier bloc est toujours produit, même vide, pour que l'écrivain connaisse le schéma.
+        """
+        debut, fin = ExportService._bornes(debut, fin)
+
+        if isinstance(source, pd.DataFrame):
+            if not source.index.is_monotonic_increasing:
+                source = source.sort_index()
+            # Recherche dichotomique des bornes : seules des tranches de la source sont copiées
+            premier = source.index.searchsorted(debut) if debut is not None else 0
+            dernier = source.index.searchsorted(fin) if fin is not None else len(source)
+            blocs = (
+                source.iloc[i:min(i + taille_bloc, dernier)]
+                for i in range(premier, max(dernier, premier + 1), taille_bloc)
+            )
+        else:
+            blocs = pd.read_csv(source, index_col=0, parse_dates=True, chunksize=taille_bloc)
+
+        premier_bloc = True
+        for bloc in blocs:
+            if not isinstance(source, pd.DataFrame):
+                bloc.index = pd.to_datetime(bloc.index)
+                if debut is not None:
+                    bloc = bloc[bloc.index >= debut]
+                if fin is not None:
+                    bloc = bloc[bloc.index < fin]
+            if colonnes is not None:
+                bloc = bloc[list(colonnes)]
+            if premier_bloc or not bloc.empty:
+                yield bloc.rename_axis('Date')
+            premier_bloc = False
+
+    @staticmethod
+    def _ecrire_csv(blocs, flux_texte):
+        """Écrit les blocs en CSV, l'en-tête seulement avec le premier"""
+        lignes = 0
+        for numero, bloc in enumerate(blocs):
+            bloc.to_csv(flux_texte, header=numero == 0)
+            lignes += len(bloc)
+        return lignes
+
+    @staticmethod
+    def _ecrire_arrow(blocs, destination, format):
+        """Écrit les blocs en Parquet ou Arrow IPC avec un schéma fixé par le premier bloc"""
+        if pa is None:
+            raise ImportError(f"Le format {format} nécessite le paquet pyarrow")
+
+        lignes = 0
+        ecrivain = None
+        schema = None
+        try:
+            for bloc in blocs:
+                table = pa.Table.from_pandas(bloc, schema=schema, preserve_index=True)
+                if ecrivain is None:
+                    schema = table.schema
+                    if format == 'parquet':
+                        ecrivain = pa.parquet.ParquetWriter(destination, schema)
+                    else:
+                        ecrivain = pa.ipc.new_file(destination, schema)
+                ecrivain.write_table(table)
+                lignes += len(bloc)
+        finally:
+            if ecrivain is not None:
+                ecrivain.close()
+        return lignes
+
+    @staticmethod
+    def exporter(source, destination, format='csv.gz', debut=None, fin=None, colonnes=None, taille_bloc=100_000):
+        """Exporte la source vers destination (chemin ou fichier binaire) et renvoie le nombre de lignes"""
+        if format not in FORMATS_EXPORT:
+            raise ValueError(f"Format d'export inconnu: {format} (formats: {', '.join(FORMATS_EXPORT)})")
+
+        blocs = ExportService.iterer_blocs(source, debut, fin, colonnes, taille_bloc)
+
+        if format in ('parquet', 'arrow'):
+            return ExportService._ecrire_arrow(blocs, destination, format)
+
+        if format == 'csv.zst' and zstandard is None:
+            raise ImportError("Le format csv.zst nécessite le paquet zstandard")
+
+        brut = open(destination, 'wb') if isinstance(destination, (str, bytes, os.PathLike)) else destination
+        try:
+            if format == 'csv.gz':
+                compresse = gzip.GzipFile(fileobj=brut, mode='wb')
+            else:
+                compresse = zstandard.ZstdCompressor().stream_writer(brut, closefd=False)
+            with io.TextIOWrapper(compresse, encoding='utf-8', newline='') as flux_texte:
+                return ExportService._ecrire_csv(blocs, flux_texte)
+        finally:
+            if brut is not destination:
+                brut.close()
+
+    @staticmethod
+    def exporter_vers_fichier_temporaire(source, format='csv.gz', **options):
+        """Exporte dans un fichier temporaire sur disque, rembobiné et prêt à être lu"""
+        fichier = tempfile.TemporaryFile()
+        try:
+            ExportService.exporter(source, fichier, format, **options)
+        except BaseException:
+            fichier.close()
+            raise
+        fichier.seek(0)
+        return fichier
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Export des données EUR/USD par blocs")
+    parser.add_argument('destination')
+    parser.add_argument('--source', default='eur_usd.csv')
+    parser.add_argument('--format', choices=list(FORMATS_EXPORT), default='csv.gz')
+    parser.add_argument('--debut')
+    parser.add_argument('--fin')
+    parser.add_argument('--colonnes', nargs='+')
+    parser.add_argument('--taille-bloc', type=int, default=100_000)
+    args = parser.parse_args()
+
+    lignes = ExportService.exporter(args.source, args.destination, args.format, args.debut, args.fin,
+                                    args.colonnes, args.taille_bloc)
+    print(f"{lignes} lignes exportées dans {args.destination}")
+
+
+if __name__ == '__main__':
+    main()
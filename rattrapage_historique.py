@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import requests
+
+from registre_fournisseurs import delai_exponentiel, est_erreur_transitoire
+
+
+# Origine de la grille des blocs : premier taux de référence de l'euro publié par la BCE
+EPOQUE_BLOCS = date(1999, 1, 4)
+
+
+class LimiteurDebit:
+    """Espace les requêtes pour ne pas dépasser un débit donné, partagé entre threads"""
+
+    def __init__(self, requetes_par_seconde, horloge=time.monotonic, sommeil=time.sleep):
+        self.intervalle = 1.0 / requetes_par_seconde if requetes_par_seconde else 0.0
+        self._horloge = horloge
+        self._sommeil = sommeil
+        self._prochain = 0.0
+        self._verrou = threading.Lock()
+
+    def attendre(self):
+        """Bloque jusqu'au prochain créneau libre"""
+        with self._verrou:
+            maintenant = self._horloge()
+            creneau = max(maintenant, self._prochain)
+            self._prochain = creneau + self.intervalle
+        if creneau > maintenant:
+            self._sommeil(creneau - maintenant)
+
+
+class RattrapageHistorique:
+    """Télécharge un historique de taux EUR/USD par blocs, en parallèle et avec reprise
+
+    La plage de dates est découpée en blocs de `taille_bloc` jours téléchargés par un pool
+    de `max_workers` threads, sous un débit limité. Chaque bloc terminé est enregistré dans
+    `dossier_points` : une exécution interrompue reprend là où elle s'est arrêtée. Les
+    blocs qui couvrent le jour courant ne sont jamais figés car leurs taux peuvent encore
+    être publiés. L'API attendue suit le format de Frankfurter (BCE) :
+    GET {url_base}/{debut}..{fin}?from=EUR&to=USD -> {"rates": {"AAAA-MM-JJ": {"USD": taux}}}
+    """
+
+    def __init__(self, url_base='https://api.frankfurter.app', dossier_points='.rattrapage',
+                 taille_bloc=90, max_workers=4, requetes_par_seconde=5.0, timeout=10,
+                 tentatives=3, delai_base=0.5, delai_max=8.0, sommeil=time.sleep, aleatoire=random.random):
+        self.url_base = url_base.rstrip('/')
+        self.dossier_points = dossier_points
+        self.taille_bloc = taille_bloc
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.tentatives = tentatives
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self._sommeil = sommeil
+        self._aleatoire = aleatoire
+        self.limiteur = LimiteurDebit(requetes_par_seconde)
+
+    def decouper(self, debut, fin):
+        """Découpe [debut, fin] sur une grille fixe de blocs de taille_bloc jours
+
+        La grille part de EPOQUE_BLOCS et ne dépend pas de la plage demandée : deux
+        exécutions décalées de quelques jours partagent les mêmes blocs, donc les mêmes
+        points de reprise. Seuls le premier et le dernier bloc sont rognés à la plage.
+        """
+        blocs = []
+        decalage = (debut - EPOQUE_BLOCS).days % self.taille_bloc
+        courant = debut
+        fin_bloc = debut + timedelta(days=self.taille_bloc - 1 - decalage)
+        while courant <= fin:
+            blocs.append((courant, min(fin_bloc, fin)))
+            courant = fin_bloc + timedelta(days=1)
+            fin_bloc = courant + timedelta(days=self.taille_bloc - 1)
+        return blocs
+
+    def _chemin_point(self, bloc):
+        """Chemin du point de reprise d'un bloc, rangé par source pour ne jamais mélanger deux API"""
+        source = hashlib.sha256(self.url_base.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.dossier_points, source, f"{bloc[0].isoformat()}_{bloc[1].isoformat()}.csv")
+
+    def _telecharger_bloc(self, bloc):
+        """Télécharge un bloc, avec nouvelles tentatives sur les erreurs transitoires"""
+        url = f"{self.url_base}/{bloc[0].isoformat()}..{bloc[1].isoformat()}"
+        for tentative in range(self.tentatives):
+            self.limiteur.attendre()
+            try:
+                response = requests.get(url, params={'from': 'EUR', 'to': 'USD'}, timeout=self.timeout)
+                response.raise_for_status()
+                taux = {jour: valeurs['USD'] for jour, valeurs in response.json().get('rates', {}).items()}
+                break
+            except requests.RequestException as e:
+                if not est_erreur_transitoire(e) or tentative == self.tentatives - 1:
+                    raise
+                self._sommeil(delai_exponentiel(tentative, self.delai_base, self.delai_max, self._aleatoire))
+
+        df = pd.DataFrame({'EUR_USD': pd.Series(taux, dtype='float64')})
+        df.index = pd.to_datetime(df.index)
+        # L'API ramène un début tombant un jour sans cotation au jour ouvré précédent :
+        # on ne garde que les jours du bloc pour ne pas chevaucher le bloc voisin
+        df = df[(df.index >= pd.Timestamp(bloc[0])) & (df.index <= pd.Timestamp(bloc[1]))]
+        return df.sort_index()
+
+    def _traiter_bloc(self, bloc, aujourd_hui):
+        """Télécharge un bloc et l'enregistre comme point de reprise s'il est complet"""
+        df = self._telecharger_bloc(bloc)
+        if bloc[1] < aujourd_hui:
+            chemin = self._chemin_point(bloc)
+            df.to_csv(f"{chemin}.tmp")
+            os.replace(f"{chemin}.tmp", chemin)
+        return df
+
+    @staticmethod
+    def _est_quotidien(index):
+        """Indique si un index ne contient que des dates à minuit (données journalières)"""
+        return bool((index == index.normalize()).all())
+
+    @staticmethod
+    def fusionner(df_nouveau, destination, periodes=None):
+        """Fusionne de nouvelles données dans le CSV local
+
+        Dans chaque période rattrapée (liste de couples de dates, bornes incluses), les lignes
+        existantes sont remplacées par les lignes téléchargées : un jour sans cotation (jour
+        de fermeture de la BCE) disparaît donc du fichier. Hors de ces périodes, les lignes
+        existantes sont conservées telles quelles. Par défaut, la période couvre les jours de
+        df_nouveau. L'écriture est atomique pour que les lecteurs (voir registre_donnees) ne
+        voient jamais un fichier partiel.
+        """
+        nouveau = df_nouveau.copy()
+        nouveau.index = pd.to_datetime(nouveau.index)
+        nouveau = nouveau[~nouveau.index.duplicated(keep='last')]
+        if periodes is None:
+            periodes = [(nouveau.index.min().normalize(), nouveau.index.max().normalize())] if len(nouveau) else []
+
+        if os.path.exists(destination):
+            existant = pd.read_csv(destination, index_col=0, parse_dates=True)
+            existant.index = pd.to_datetime(existant.index)
+
+            dans_periodes = np.zeros(len(existant), dtype=bool)
+            for debut, fin in periodes:
+                dans_periodes |= ((existant.index >= pd.Timestamp(debut))
+                                  & (existant.index < pd.Timestamp(fin) + pd.Timedelta(days=1)))
+            existant = existant[~dans_periodes]
+
+            df = pd.concat([existant, nouveau])
+            # Une même date n'est un doublon que si les deux côtés sont des données journalières
+            if (RattrapageHistorique._est_quotidien(existant.index)
+                    and RattrapageHistorique._est_quotidien(nouveau.index)):
+                df = df[~df.index.duplicated(keep='last')]
+        else:
+            df = nouveau
+
+        df = df.sort_index(kind='stable')
+        df.to_csv(f"{destination}.tmp")
+        os.replace(f"{destination}.tmp", destination)
+        return df
+
+    def executer(self, debut, fin, destination='eur_usd.csv'):
+        """Rattrape l'historique entre deux dates et le fusionne dans destination
+
+        Renvoie un rapport : nombre de blocs, blocs repris, blocs téléchargés, échecs par
+        bloc et nombre de lignes du fichier final. Les blocs en échec seront retentés à la
+        prochaine exécution.
+        """
+        aujourd_hui = date.today()
+        blocs = self.decouper(debut, fin)
+        if blocs:
+            os.makedirs(os.path.dirname(self._chemin_point(blocs[0])), exist_ok=True)
+
+        resultats = []
+        reussis = []
+        a_faire = []
+        for bloc in blocs:
+            chemin = self._chemin_point(bloc)
+            if os.path.exists(chemin):
+                resultats.append(pd.read_csv(chemin, index_col=0, parse_dates=True))
+                reussis.append(bloc)
+            else:
+                a_faire.append(bloc)
+
+        echecs = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futurs = {pool.submit(self._traiter_bloc, bloc, aujourd_hui): bloc for bloc in a_faire}
+            for futur in as_completed(futurs):
+                bloc = futurs[futur]
+                try:
+                    resultats.append(futur.result())
+                    reussis.append(bloc)
+                except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+                    echecs[f"{bloc[0].isoformat()}..{bloc[1].isoformat()}"] = str(e)
+
+        # Seules les périodes des blocs obtenus remplacent les données existantes
+        lignes = 0
+        resultats = [df for df in resultats if not df.empty]
+        if resultats:
+            telecharges = pd.concat(resultats).sort_index(kind='stable')
+            telecharges = telecharges[~telecharges.index.duplicated(keep='last')]
+            lignes = len(self.fusionner(telecharges, destination, reussis))
+
+        return {
+            'Blocs': len(blocs),
+            'Repris': len(blocs) - len(a_faire),
+            'Telecharges': len(a_faire) - len(echecs),
+            'Echecs': echecs,
+            'Lignes': lignes,
+        }
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Rattrapage de l'historique EUR/USD")
+    parser.add_argument('--debut', type=date.fromisoformat, default=date.today() - timedelta(days=730))
+    parser.add_argument('--fin', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--destination', default='eur_usd.csv')
+    parser.add_argument('--url-base', default='https://api.frankfurter.app')
+    parser.add_argument('--taille-bloc', type=int, default=90)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--debit', type=float, default=5.0, help="Requêtes par seconde")
+    args = parser.parse_args()
+
+    rattrapage = RattrapageHistorique(args.url_base, taille_bloc=args.taille_bloc,
+                                      max_workers=args.workers, requetes_par_seconde=args.debit)
+    rapport = rattrapage.executer(args.debut, args.fin, args.destination)
+
+    print(f"{rapport['Blocs']} blocs : {rapport['Repris']} repris, {rapport['Telecharges']} téléchargés, "
+          f"{len(rapport['Echecs'])} en échec - {rapport['Lignes']} lignes dans {args.destination}")
+    for bloc, erreur in rapport['Echecs'].items():
+        print(f"  {bloc}: {erreur}")
+    return 1 if rapport['Echecs'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class InstantaneDonnees:
+    """Jeu de données préparé et figé, partagé en lecture seule entre toutes les sessions"""
+
+    def __init__(self, dates, valeurs, colonnes, signature, version):
+        self.dates = dates
+        self.valeurs = valeurs
+        self.colonnes = colonnes
+        self.signature = signature
+        self.version = version
+
+    def dataframe(self):
+        """Construit un DataFrame qui réutilise les tampons NumPy sans les copier"""
+        return pd.DataFrame(
+            self.valeurs,
+            index=pd.DatetimeIndex(self.dates, copy=False),
+            columns=self.colonnes,
+            copy=False,
+        )
+
+
+class RegistreDonnees:
+    """Registre de processus qui charge un CSV une seule fois et le recharge quand il change
+
+    Le fichier est surveillé par un thread d'arrière-plan : la date de modification et la
+    taille servent de test rapide, l'empreinte SHA-256 confirme que le contenu a réellement
+    changé avant de relancer le chargement.
+    """
+
+    def __init__(self, chemin, intervalle=2.0):
+        self.chemin = os.path.abspath(chemin)
+        self.intervalle = intervalle
+        self._instantane = None
+        self._version = 0
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def preparer_donnees(df):
+        """Convertit l'index en dates triées et traite les valeurs manquantes"""
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index()
+
+        # Gère les valeurs manquantes - propagation vers l'avant pour week-ends/jours fériés
+        df = df.ffill()
+
+        # Supprime toutes les valeurs NaN restantes
+        return df.dropna()
+
+    @staticmethod
+    def _calculer_empreinte(chemin, taille_bloc=1 << 20):
+        """Calcule l'empreinte SHA-256 du fichier par blocs"""
+        empreinte = hashlib.sha256()
+        with open(chemin, 'rb') as fichier:
+            for bloc in iter(lambda: fichier.read(taille_bloc), b''):
+                empreinte.update(bloc)
+        return empreinte.hexdigest()
+
+    def _charger(self, stat, empreinte):
+        """Lit le CSV et publie un nouvel instantané en lecture seule"""
+        df = pd.read_csv(self.chemin, index_col=0, parse_dates=True)
+        df = self.preparer_donnees(df)
+
+        dates = np.ascontiguousarray(df.index.values, dtype='datetime64[ns]')
+        valeurs = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+        dates.flags.writeable = False
+        valeurs.flags.writeable = False
+
+        self._version += 1
+        self._instantane = InstantaneDonnees(
+            dates, valeurs, list(df.columns),
+            (stat.st_mtime_ns, stat.st_size, empreinte),
+            self._version,
+        )
+        return self._instantane
+
+    def verifier_modifications(self):
+        """Recharge le fichier s'il a changé ; renvoie True si un rechargement a eu lieu"""
+        with self._verrou:
+            try:
+                stat = os.stat(self.chemin)
+            except FileNotFoundError:
+                return False
+
+            actuel = self._instantane
+            if actuel is not None and actuel.signature[:2] == (stat.st_mtime_ns, stat.st_size):
+                return False
+
+            empreinte = self._calculer_empreinte(self.chemin)
+            if actuel is not None and actuel.signature[2] == empreinte:
+                # Fichier touché mais contenu identique : on mémorise seulement la nouvelle date
+                actuel.signature = (stat.st_mtime_ns, stat.st_size, empreinte)
+                return False
+
+            self._charger(stat, empreinte)
+            return True
+
+    def instantane(self):
+        """Renvoie l'instantané courant, en le chargeant au premier appel"""
+        if self._instantane is None:
+            self.verifier_modifications()
+            self.demarrer_surveillance()
+        return self._instantane
+
+    def dataframe(self):
+        """Renvoie les données préparées sous forme de DataFrame, ou None si le fichier est absent"""
+        instantane = self.instantane()
+        return instantane.dataframe() if instantane is not None else None
+
+    def _surveiller(self):
+        """Boucle du thread de surveillance"""
+        while not self._arret.wait(self.intervalle):
+            try:
+                self.verifier_modifications()
+            except (OSError, ValueError, pd.errors.ParserError):
+                # Fichier en cours d'écriture : l'instantané précédent reste servi
+                continue
+
+    def demarrer_surveillance(self):
+        """Lance le thread de surveillance s'il ne tourne pas déjà"""
+        with self._verrou:
+            if self._thread is None or not self._thread.is_alive():
+                self._arret.clear()
+                self._thread = threading.Thread(
+                    target=self._surveiller, name=f"registre-{os.path.basename(self.chemin)}", daemon=True
+                )
+                self._thread.start()
+
+    def arreter_surveillance(self):
+        """Arrête le thread de surveillance"""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_registres = {}
+_verrou_registres = threading.Lock()
+
+
+def obtenir_registre(chemin='eur_usd.csv'):
+    """Renvoie le registre unique du processus associé à un fichier"""
+    chemin = os.path.abspath(chemin)
+    with _verrou_registres:
+        if chemin not in _registres:
+            _registres[chemin] = RegistreDonnees(chemin)
+        return _registres[chemin]
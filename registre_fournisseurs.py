@@ -0,0 +1,248 @@
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+
+
+class AucunFournisseurDisponible(Exception):
+    """Levée quand aucun fournisseur n'a pu donner de taux"""
+
+    def __init__(self, erreurs):
+        self.erreurs = erreurs
+        super().__init__(f"Aucun fournisseur disponible ({len(erreurs)} échec(s))")
+
+
+def est_erreur_transitoire(erreur):
+    """Indique si une erreur réseau mérite une nouvelle tentative"""
+    if isinstance(erreur, requests.HTTPError) and erreur.response is not None:
+        return erreur.response.status_code == 429 or erreur.response.status_code >= 500
+    return isinstance(erreur, (requests.Timeout, requests.ConnectionError))
+
+
+def delai_exponentiel(tentative, delai_base, delai_max, aleatoire=random.random):
+    """Délai exponentiel plafonné avec gigue aléatoire (« full jitter »)"""
+    return aleatoire() * min(delai_max, delai_base * 2 ** tentative)
+
+
+class Fournisseur:
+    """Décrit une API de taux de change : URL, paramètres et extraction du taux EUR/USD"""
+
+    def __init__(self, nom, url, extraire, params=None, timeout=10):
+        self.nom = nom
+        self.url = url
+        self.extraire = extraire
+        self.params = params or {}
+        self.timeout = timeout
+
+
+class StatistiquesFournisseur:
+    """Santé observée d'un fournisseur : latence, taux d'erreur et état du disjoncteur"""
+
+    def __init__(self):
+        self.appels = 0
+        self.echecs = 0
+        self.echecs_consecutifs = 0
+        self.taux_erreur = 0.0
+        self.latence_moyenne = None
+        self.derniere_erreur = None
+        self.ouvert_jusqua = 0.0
+
+    def vers_dict(self):
+        """Sérialise les statistiques pour la persistance"""
+        return dict(vars(self))
+
+    @classmethod
+    def depuis_dict(cls, donnees):
+        """Restaure des statistiques persistées"""
+        stats = cls()
+        for cle, valeur in donnees.items():
+            if hasattr(stats, cle):
+                setattr(stats, cle, valeur)
+        return stats
+
+
+class RegistreFournisseurs:
+    """Choisit les fournisseurs selon leur santé observée
+
+    Les fournisseurs sont essayés du plus sain au moins sain (taux d'erreur puis latence,
+    moyennes mobiles exponentielles). Après `seuil_ouverture` échecs consécutifs, le
+    disjoncteur s'ouvre et le fournisseur est ignoré pendant `duree_ouverture` secondes,
+    puis un seul essai est autorisé (semi-ouvert). Les erreurs transitoires sont réessayées
+    avec un délai exponentiel aléatoire. L'état peut être persisté dans `fichier_etat` pour
+    survivre aux redémarrages.
+    """
+
+    def __init__(self, fournisseurs, seuil_ouverture=3, duree_ouverture=300.0, tentatives=3,
+                 delai_base=0.5, delai_max=8.0, lissage=0.3, fichier_etat=None,
+                 horloge=time.time, sommeil=time.sleep, aleatoire=random.random):
+        self.fournisseurs = list(fournisseurs)
+        self.seuil_ouverture = seuil_ouverture
+        self.duree_ouverture = duree_ouverture
+        self.tentatives = tentatives
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self.lissage = lissage
+        self.fichier_etat = fichier_etat
+        self._horloge = horloge
+        self._sommeil = sommeil
+        self._aleatoire = aleatoire
+        self._verrou = threading.Lock()
+        self.statistiques = {f.nom: StatistiquesFournisseur() for f in self.fournisseurs}
+        self._charger_etat()
+
+    def _charger_etat(self):
+        """Recharge les statistiques persistées, en ignorant un fichier absent ou corrompu"""
+        if not self.fichier_etat:
+            return
+        try:
+            with open(self.fichier_etat, encoding='utf-8') as fichier:
+                etat = json.load(fichier)
+        except (OSError, ValueError):
+            return
+        for nom, donnees in etat.items():
+            if nom in self.statistiques and isinstance(donnees, dict):
+                self.statistiques[nom] = StatistiquesFournisseur.depuis_dict(donnees)
+
+    def _sauvegarder_etat(self):
+        """Écrit les statistiques de façon atomique"""
+        if not self.fichier_etat:
+            return
+        with self._verrou:
+            etat = {nom: stats.vers_dict() for nom, stats in self.statistiques.items()}
+        temporaire = f"{self.fichier_etat}.tmp"
+        try:
+            with open(temporaire, 'w', encoding='utf-8') as fichier:
+                json.dump(etat, fichier)
+            os.replace(temporaire, self.fichier_etat)
+        except OSError:
+            pass
+
+    def etat(self, nom):
+        """Renvoie l'état du disjoncteur : 'ferme', 'ouvert' ou 'semi-ouvert'"""
+        stats = self.statistiques[nom]
+        if stats.echecs_consecutifs < self.seuil_ouverture:
+            return 'ferme'
+        return 'ouvert' if self._horloge() < stats.ouvert_jusqua else 'semi-ouvert'
+
+    def ordonner(self):
+        """Renvoie les fournisseurs utilisables, du plus sain au moins sain"""
+        def score(fournisseur):
+            stats = self.statistiques[fournisseur.nom]
+            semi_ouvert = self.etat(fournisseur.nom) == 'semi-ouvert'
+            return (semi_ouvert, stats.taux_erreur, stats.latence_moyenne or 0.0)
+
+        utilisables = [f for f in self.fournisseurs if self.etat(f.nom) != 'ouvert']
+        return sorted(utilisables, key=score)
+
+    def _enregistrer(self, nom, latence, erreur=None):
+        """Met à jour les moyennes mobiles et le disjoncteur après un appel"""
+        with self._verrou:
+            stats = self.statistiques[nom]
+            stats.appels += 1
+            stats.taux_erreur += self.lissage * ((erreur is not None) - stats.taux_erreur)
+            if stats.latence_moyenne is None:
+                stats.latence_moyenne = latence
+            else:
+                stats.latence_moyenne += self.lissage * (latence - stats.latence_moyenne)
+
+            if erreur is None:
+                stats.echecs_consecutifs = 0
+                stats.ouvert_jusqua = 0.0
+                return
+
+            stats.echecs += 1
+            stats.echecs_consecutifs += 1
+            stats.derniere_erreur = str(erreur)
+            if stats.echecs_consecutifs >= self.seuil_ouverture:
+                stats.ouvert_jusqua = self._horloge() + self.duree_ouverture
+
+    def obtenir_taux(self):
+        """Renvoie (taux, nom du fournisseur) depuis le premier fournisseur sain qui répond
+
+        Lève AucunFournisseurDisponible avec le détail des erreurs si tous échouent.
+        """
+        erreurs = {}
+        try:
+            for fournisseur in self.ordonner():
+                # Un fournisseur semi-ouvert n'a droit qu'à un seul essai
+                tentatives = 1 if self.etat(fournisseur.nom) == 'semi-ouvert' else self.tentatives
+                for tentative in range(tentatives):
+                    debut = time.perf_counter()
+                    try:
+                        response = requests.get(fournisseur.url, params=fournisseur.params,
+                                                timeout=fournisseur.timeout)
+                        response.raise_for_status()
+                        taux = float(fournisseur.extraire(response.json()))
+                    except (KeyError, TypeError, ValueError) as e:
+                        # Réponse invalide : inutile de réessayer ce fournisseur
+                        self._enregistrer(fournisseur.nom, time.perf_counter() - debut, e)
+                        erreurs[fournisseur.nom] = f"Réponse invalide: {e!r}"
+                        break
+                    except requests.RequestException as e:
+                        self._enregistrer(fournisseur.nom, time.perf_counter() - debut, e)
+                        erreurs[fournisseur.nom] = str(e)
+                        if (not est_erreur_transitoire(e) or tentative == tentatives - 1
+                                or self.etat(fournisseur.nom) == 'ouvert'):
+                            break
+                        self._sommeil(delai_exponentiel(tentative, self.delai_base, self.delai_max, self._aleatoire))
+                    else:
+                        self._enregistrer(fournisseur.nom, time.perf_counter() - debut)
+                        return taux, fournisseur.nom
+        finally:
+            self._sauvegarder_etat()
+
+        raise AucunFournisseurDisponible(erreurs)
+
+    def metriques(self):
+        """Renvoie les métriques de santé de chaque fournisseur"""
+        with self._verrou:
+            return {
+                f.nom: {
+                    'Etat': self.etat(f.nom),
+                    'Appels': self.statistiques[f.nom].appels,
+                    'Echecs': self.statistiques[f.nom].echecs,
+                    'Echecs_Consecutifs': self.statistiques[f.nom].echecs_consecutifs,
+                    'Taux_Erreur': self.statistiques[f.nom].taux_erreur,
+                    'Latence_Moyenne_ms': (self.statistiques[f.nom].latence_moyenne or 0.0) * 1000,
+                    'Derniere_Erreur': self.statistiques[f.nom].derniere_erreur,
+                }
+                for f in self.fournisseurs
+            }
+
+
+def fournisseurs_par_defaut():
+    """APIs fonctionnelles sans clé requise, dans l'ordre de préférence initial"""
+    return [
+        Fournisseur(
+            'ExchangeRate-API (Accès libre)',
+            'https://api.exchangerate-api.com/v4/latest/EUR',
+            lambda data: data['rates']['USD'],
+        ),
+        Fournisseur(
+            'Currency API (Fawazahmed0)',
+            'https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@latest/v1/currencies/eur.json',
+            lambda data: data['eur']['usd'],
+        ),
+        Fournisseur(
+            'FreeForexAPI',
+            'https://www.freeforexapi.com/api/live',
+            lambda data: data['rates']['EURUSD']['rate'],
+            params={'pairs': 'EURUSD'},
+        ),
+    ]
+
+
+_registre_par_defaut = None
+_verrou_registre = threading.Lock()
+
+
+def obtenir_registre_fournisseurs(fichier_etat='fournisseurs_etat.json'):
+    """Renvoie le registre de fournisseurs unique du processus"""
+    global _registre_par_defaut
+    with _verrou_registre:
+        if _registre_par_defaut is None:
+            _registre_par_defaut = RegistreFournisseurs(fournisseurs_par_defaut(), fichier_etat=fichier_etat)
+        return _registre_par_defaut
@@ -1,4 +1,5 @@
 import unittest
+import tracemalloc
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -75,5 +76,103 @@ class TestAnalysisService(unittest.TestCase):
         # Vérifie que l'erreur absolue moyenne est positive
         self.assertGreaterEqual(metriques['Erreur_Absolue_Moyenne'], 0)
 
+    def test_prevision_lissage_exponentiel(self):
+        """Test du lissage exponentiel simple face à la récursion explicite"""
+        alpha = 0.3
+        df_prevision, rmse = AnalysisService.prevision_lissage_exponentiel(self.df, alphas=[alpha])
+        
+        # Récursion de référence : niveau initial = première observation
+        niveau = self.df['EUR_USD'].iloc[0]
+        attendues = []
+        for taux in self.df['EUR_USD'].iloc[1:]:
+            attendues.append(niveau)
+            niveau = alpha * taux + (1 - alpha) * niveau
+        
+        np.testing.assert_allclose(df_prevision['Prevision_SES'].values, attendues, rtol=1e-12)
+        self.assertEqual(len(df_prevision), len(self.df) - 1)
+        self.assertIsInstance(rmse, float)
+    
+    def test_prevision_holt_grille(self):
+        """Test que la grille de Holt retient le couple de plus faible RMSE"""
+        alphas, betas = [0.2, 0.5, 0.8], [0.1, 0.3]
+        df_prevision, rmse = AnalysisService.prevision_holt(self.df, alphas=alphas, betas=betas)
+        
+        def holt(alpha, beta):
+            niveau, tendance, previsions = self.df['EUR_USD'].iloc[0], 0.0, []
+            for taux in self.df['EUR_USD'].iloc[1:]:
+                previsions.append(niveau + tendance)
+                nouveau = alpha * taux + (1 - alpha) * (niveau + tendance)
+                tendance = beta * (nouveau - niveau) + (1 - beta) * tendance
+                niveau = nouveau
+            erreurs = self.df['EUR_USD'].iloc[1:].values - np.array(previsions)
+            return np.sqrt(np.mean(erreurs ** 2))
+        
+        meilleur = min(holt(a, b) for a in alphas for b in betas)
+        self.assertAlmostEqual(rmse, meilleur, places=10)
+        self.assertIn('alpha', df_prevision.attrs['parametres'])
+        self.assertIn('beta', df_prevision.attrs['parametres'])
+    
+    def test_previsions_par_blocs(self):
+        """Test que le découpage en blocs de temps ne change pas les prévisions"""
+        taux = 1.1 + np.cumsum(np.random.default_rng(0).normal(0, 0.005, 300))
+        df = pd.DataFrame({'EUR_USD': taux}, index=pd.date_range('2023-01-01', periods=300, freq='D'))
+        alpha, beta = 0.3, 0.1
+        
+        df_prevision, _ = AnalysisService.prevision_holt(df, alphas=[alpha], betas=[beta])
+        F = np.array([[[1 - alpha, 1 - alpha], [-alpha * beta, 1 - alpha * beta]]])
+        g = np.array([[alpha, alpha * beta]])
+        reponse, libre = AnalysisService._reponses_lineaires(F, g, np.array([taux[0], 0.0]), len(taux) - 1)
+        par_blocs = np.concatenate([
+            p[0] for _, p in AnalysisService._iterer_previsions(taux, reponse, libre, taille_bloc=7)
+        ])
+        
+        np.testing.assert_allclose(par_blocs, df_prevision['Prevision_Holt'].values, rtol=1e-12)
+        # La réponse impulsionnelle est tronquée dès que F^K est négligeable
+        self.assertLess(reponse.shape[1], len(taux) - 1)
+    
+    def test_memoire_bornee_serie_longue(self):
+        """Test que la mémoire de pointe ne croît pas avec la longueur de la série × la grille"""
+        taux = 1.1 + np.cumsum(np.random.default_rng(0).normal(0, 0.005, 100_000))
+        df = pd.DataFrame({'EUR_USD': taux}, index=pd.date_range('2023-01-01', periods=len(taux), freq='min'))
+        
+        tracemalloc.start()
+        try:
+            _, rmse = AnalysisService.prevision_holt(df)
+            _, pic = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        # Grille par défaut de 90 points : environ 25 Mo, contre plus de 800 Mo sans découpage
+        self.assertLess(pic, 60 * 1024 ** 2)
+        self.assertGreater(rmse, 0)
+    
+    def test_prevision_ar(self):
+        """Test de la prévision AR(p) par moindres carrés"""
+        df_prevision, rmse = AnalysisService.prevision_ar(self.df, ordre=2)
+        
+        self.assertIn('Prevision_AR', df_prevision.columns)
+        self.assertEqual(len(df_prevision), len(self.df) - 2)
+        
+        # La prévision reproduit les coefficients ajustés
+        p = df_prevision.attrs['parametres']
+        attendu = p['constante'] + p['phi_1'] * self.df['EUR_USD'].iloc[1] + p['phi_2'] * self.df['EUR_USD'].iloc[0]
+        self.assertAlmostEqual(df_prevision['Prevision_AR'].iloc[0], attendu, places=10)
+        
+        # Les moindres carrés font au moins aussi bien que la prévision naïve sur les mêmes jours
+        taux = self.df['EUR_USD'].values
+        rmse_naive = np.sqrt(np.mean((taux[2:] - taux[1:-1]) ** 2))
+        self.assertLessEqual(rmse, rmse_naive + 1e-12)
+        
+        with self.assertRaises(ValueError):
+            AnalysisService.prevision_ar(self.df.iloc[:3], ordre=2)
+    
+    def test_calculer_erreurs_prevision_autre_modele(self):
+        """Test des métriques d'erreur sur une autre colonne de prévision"""
+        df_prevision, _ = AnalysisService.prevision_lissage_exponentiel(self.df)
+        metriques = AnalysisService.calculer_erreurs_prevision(df_prevision, 'Prevision_SES')
+        
+        self.assertGreaterEqual(metriques['Erreur_Absolue_Moyenne'], 0)
+        self.assertEqual(len(metriques['Erreurs']), len(df_prevision))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import unittest
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from export_donnees import ExportService, zstandard
+
+class TestExportService(unittest.TestCase):
+    """Tests unitaires pour l'export par blocs"""
+
+    def setUp(self):
+        """Prépare des données de test et un dossier de travail"""
+        dates = pd.date_range(start='2023-01-01 10:30', periods=100, freq='D')
+        self.df = pd.DataFrame({
+            'EUR_USD': np.linspace(1.05, 1.15, 100),
+            'Rendement_Journalier': np.linspace(-1, 1, 100),
+        }, index=dates)
+        self.dossier = tempfile.mkdtemp()
+        self.source_csv = os.path.join(self.dossier, 'eur_usd.csv')
+        self.df.to_csv(self.source_csv)
+
+    def tearDown(self):
+        """Nettoie le dossier de travail"""
+        shutil.rmtree(self.dossier)
+
+    def test_blocs_bornes(self):
+        """Test que la source CSV est lue par blocs de taille bornée"""
+        blocs = list(ExportService.iterer_blocs(self.source_csv, taille_bloc=30))
+
+        self.assertEqual([len(b) for b in blocs], [30, 30, 30, 10])
+
+    def test_filtre_periode_et_colonnes(self):
+        """Test du filtre par période (fin incluse) et par colonnes, pour les deux sources"""
+        attendu = self.df.loc['2023-01-10':'2023-02-05', ['EUR_USD']]
+        for source in (self.df, self.source_csv):
+            blocs = ExportService.iterer_blocs(source, '2023-01-10', '2023-02-05', ['EUR_USD'], taille_bloc=7)
+            resultat = pd.concat(list(blocs))
+
+            self.assertEqual(list(resultat.columns), ['EUR_USD'])
+            self.assertEqual(len(resultat), len(attendu))
+            self.assertEqual(resultat.index[-1], attendu.index[-1])
+
+    def test_export_csv_gzip(self):
+        """Test de l'export CSV compressé en gzip"""
+        destination = os.path.join(self.dossier, 'export.csv.gz')
+        lignes = ExportService.exporter(self.df, destination, 'csv.gz', taille_bloc=16)
+
+        self.assertEqual(lignes, 100)
+        with gzip.open(destination, 'rt') as fichier:
+            relu = pd.read_csv(fichier, index_col=0, parse_dates=True)
+        np.testing.assert_allclose(relu['EUR_USD'].values, self.df['EUR_USD'].values)
+        self.assertEqual(relu.index.name, 'Date')
+
+    @unittest.skipIf(zstandard is None, "zstandard non installé")
+    def test_export_csv_zstd(self):
+        """Test de l'export CSV compressé en zstd"""
+        destination = os.path.join(self.dossier, 'export.csv.zst')
+        ExportService.exporter(self.source_csv, destination, 'csv.zst', taille_bloc=16)
+
+        with open(destination, 'rb') as fichier:
+            texte = zstandard.ZstdDecompressor().stream_reader(fichier).read().decode()
+        self.assertEqual(len(pd.read_csv(io.StringIO(texte))), 100)
+
+    def test_export_parquet(self):
+        """Test de l'export Parquet : un groupe de lignes par bloc"""
+        import pyarrow.parquet as pq
+        destination = os.path.join(self.dossier, 'export.parquet')
+        ExportService.exporter(self.source_csv, destination, 'parquet', taille_bloc=25)
+
+        self.assertEqual(pq.ParquetFile(destination).num_row_groups, 4)
+        relu = pd.read_parquet(destination)
+        np.testing.assert_allclose(relu['EUR_USD'].values, self.df['EUR_USD'].values)
+        self.assertIsInstance(relu.index, pd.DatetimeIndex)
+
+    def test_export_arrow(self):
+        """Test de l'export Arrow IPC vers un fichier temporaire"""
+        import pyarrow.ipc as ipc
+        fichier = ExportService.exporter_vers_fichier_temporaire(self.df, 'arrow', debut='2023-03-01', taille_bloc=10)
+
+        with fichier:
+            relu = ipc.open_file(fichier).read_pandas()
+        self.assertEqual(len(relu), len(self.df.loc['2023-03-01':]))
+
+    def test_periode_vide(self):
+        """Test qu'une période vide produit un fichier valide sans ligne"""
+        destination = os.path.join(self.dossier, 'vide.parquet')
+        lignes = ExportService.exporter(self.df, destination, 'parquet', debut='2030-01-01')
+
+        self.assertEqual(lignes, 0)
+        self.assertEqual(list(pd.read_parquet(destination).columns), list(self.df.columns))
+
+    def test_fichier_temporaire_ferme_en_cas_erreur(self):
+        """Test que le fichier temporaire est fermé si l'export échoue"""
+        fichiers = []
+        temporaire = tempfile.TemporaryFile
+
+        def suivre():
+            fichiers.append(temporaire())
+            return fichiers[-1]
+
+        with patch('export_donnees.tempfile.TemporaryFile', side_effect=suivre):
+            with self.assertRaises(KeyError):
+                ExportService.exporter_vers_fichier_temporaire(self.df, 'parquet', colonnes=['Inconnue'])
+
+        self.assertTrue(fichiers[0].closed)
+
+    def test_format_inconnu(self):
+        """Test qu'un format inconnu est refusé"""
+        with self.assertRaises(ValueError):
+            ExportService.exporter(self.df, os.path.join(self.dossier, 'x'), 'xlsx')
+
+if __name__ == '__main__':
+    unittest.main()
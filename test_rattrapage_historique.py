@@ -0,0 +1,283 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from rattrapage_historique import LimiteurDebit, RattrapageHistorique
+
+# Jours fixes de fermeture TARGET (BCE) : aucun taux publié
+FERMETURES_BCE = {(1, 1), (5, 1), (12, 25), (12, 26)}
+
+def taux_du_jour(jour):
+    """Taux déterministe servi par le serveur local"""
+    return round(1.0 + jour.toordinal() % 1000 / 10000, 4)
+
+class ServeurHistorique(BaseHTTPRequestHandler):
+    """Serveur local qui imite une API de séries historiques (format Frankfurter)"""
+
+    verrou = threading.Lock()
+    requetes = []
+    en_cours = 0
+    max_en_cours = 0
+    en_panne = set()
+    # Chemin -> nombre de réponses 503 à renvoyer avant de répondre normalement
+    indisponibles = {}
+    recule_debut = False
+
+    def do_GET(self):
+        chemin = urlparse(self.path).path.strip('/')
+        with ServeurHistorique.verrou:
+            ServeurHistorique.requetes.append(chemin)
+            ServeurHistorique.en_cours += 1
+            ServeurHistorique.max_en_cours = max(ServeurHistorique.max_en_cours, ServeurHistorique.en_cours)
+        try:
+            time.sleep(0.02)
+            if chemin in ServeurHistorique.en_panne:
+                self.send_response(404)
+                self.end_headers()
+                return
+            if ServeurHistorique.indisponibles.get(chemin, 0) > 0:
+                ServeurHistorique.indisponibles[chemin] -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            debut, fin = (date.fromisoformat(d) for d in chemin.split('..'))
+            jours = [j for j in pd.bdate_range(debut, fin) if (j.month, j.day) not in FERMETURES_BCE]
+            if ServeurHistorique.recule_debut and pd.Timestamp(debut).dayofweek >= 5:
+                # Comme Frankfurter : un début de week-end renvoie aussi le jour ouvré précédent
+                jours.insert(0, pd.Timestamp(debut) - pd.offsets.BDay(1))
+            corps = json.dumps({
+                'base': 'EUR',
+                'rates': {j.date().isoformat(): {'USD': taux_du_jour(j.date())} for j in jours},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+        finally:
+            with ServeurHistorique.verrou:
+                ServeurHistorique.en_cours -= 1
+
+    def log_message(self, *args):
+        pass
+
+class TestRattrapageHistorique(unittest.TestCase):
+    """Tests unitaires pour le rattrapage de l'historique"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Démarre le serveur local"""
+        cls.serveur = ThreadingHTTPServer(('127.0.0.1', 0), ServeurHistorique)
+        cls.url = f"http://127.0.0.1:{cls.serveur.server_address[1]}"
+        threading.Thread(target=cls.serveur.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Arrête le serveur local"""
+        cls.serveur.shutdown()
+        cls.serveur.server_close()
+
+    def setUp(self):
+        """Prépare un dossier de travail et réinitialise le serveur"""
+        self.dossier = tempfile.mkdtemp()
+        self.destination = os.path.join(self.dossier, 'eur_usd.csv')
+        ServeurHistorique.requetes = []
+        ServeurHistorique.max_en_cours = 0
+        ServeurHistorique.en_panne = set()
+        ServeurHistorique.indisponibles = {}
+        ServeurHistorique.recule_debut = False
+
+    def tearDown(self):
+        """Nettoie le dossier de travail"""
+        shutil.rmtree(self.dossier)
+
+    def _rattrapage(self, **options):
+        options.setdefault('taille_bloc', 10)
+        options.setdefault('requetes_par_seconde', None)
+        return RattrapageHistorique(self.url, dossier_points=os.path.join(self.dossier, 'points'), **options)
+
+    def test_decouper(self):
+        """Test du découpage sur la grille fixe : blocs contigus, seuls les bords sont rognés"""
+        blocs = self._rattrapage().decouper(date(2023, 1, 1), date(2023, 1, 25))
+
+        # 2023-01-08 est à un multiple de 10 jours de l'origine de la grille (1999-01-04)
+        self.assertEqual(blocs, [
+            (date(2023, 1, 1), date(2023, 1, 7)),
+            (date(2023, 1, 8), date(2023, 1, 17)),
+            (date(2023, 1, 18), date(2023, 1, 25)),
+        ])
+
+    def test_decouper_independant_du_debut(self):
+        """Test que décaler le début d'un jour ne change que le premier bloc"""
+        rattrapage = self._rattrapage()
+        blocs_veille = rattrapage.decouper(date(2023, 1, 1), date(2023, 3, 31))
+        blocs_jour = rattrapage.decouper(date(2023, 1, 2), date(2023, 4, 1))
+
+        self.assertEqual(blocs_veille[1:-1], blocs_jour[1:-1])
+
+    def test_rattrapage_complet(self):
+        """Test du téléchargement parallèle et de la fusion"""
+        rattrapage = self._rattrapage(max_workers=3)
+        rapport = rattrapage.executer(date(2023, 1, 1), date(2023, 3, 31), self.destination)
+
+        self.assertEqual(rapport['Blocs'], len(rattrapage.decouper(date(2023, 1, 1), date(2023, 3, 31))))
+        self.assertEqual(rapport['Telecharges'], rapport['Blocs'])
+        self.assertEqual(rapport['Echecs'], {})
+
+        df = pd.read_csv(self.destination, index_col=0, parse_dates=True)
+        self.assertEqual(len(df), len(pd.bdate_range('2023-01-01', '2023-03-31')))
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertAlmostEqual(df['EUR_USD'].iloc[0], taux_du_jour(date(2023, 1, 2)))
+
+    def test_pool_borne(self):
+        """Test que le nombre de requêtes simultanées reste borné"""
+        self._rattrapage(max_workers=2).executer(date(2023, 1, 1), date(2023, 6, 30), self.destination)
+
+        self.assertLessEqual(ServeurHistorique.max_en_cours, 2)
+
+    def test_reprise_apres_interruption(self):
+        """Test que seuls les blocs manquants sont retéléchargés"""
+        ServeurHistorique.en_panne = {'2023-01-08..2023-01-17'}
+        rapport = self._rattrapage().executer(date(2023, 1, 1), date(2023, 1, 31), self.destination)
+
+        self.assertEqual(list(rapport['Echecs']), ['2023-01-08..2023-01-17'])
+        self.assertEqual(len(ServeurHistorique.requetes), 4)
+
+        ServeurHistorique.en_panne = set()
+        ServeurHistorique.requetes = []
+        rapport = self._rattrapage().executer(date(2023, 1, 1), date(2023, 1, 31), self.destination)
+
+        self.assertEqual(ServeurHistorique.requetes, ['2023-01-08..2023-01-17'])
+        self.assertEqual(rapport['Repris'], 3)
+        self.assertEqual(rapport['Lignes'], len(pd.bdate_range('2023-01-01', '2023-01-31')))
+
+    def test_reprise_le_lendemain(self):
+        """Test qu'une exécution décalée d'un jour réutilise les points de reprise de la veille"""
+        self._rattrapage().executer(date(2023, 1, 1), date(2023, 3, 31), self.destination)
+        ServeurHistorique.requetes = []
+
+        rapport = self._rattrapage().executer(date(2023, 1, 2), date(2023, 4, 1), self.destination)
+
+        # Seuls le premier bloc (rogné différemment) et le dernier (nouveau jour) sont retéléchargés
+        self.assertEqual(sorted(ServeurHistorique.requetes), ['2023-01-02..2023-01-07', '2023-03-29..2023-04-01'])
+        self.assertEqual(rapport['Repris'], rapport['Blocs'] - 2)
+
+    def test_points_de_reprise_par_source(self):
+        """Test qu'une autre source ne réutilise pas les points de reprise existants"""
+        self._rattrapage().executer(date(2023, 1, 1), date(2023, 1, 31), self.destination)
+        ServeurHistorique.requetes = []
+
+        # Même serveur local, mais une URL différente : c'est une autre source
+        autre = RattrapageHistorique(self.url.replace('127.0.0.1', 'localhost'),
+                                     dossier_points=os.path.join(self.dossier, 'points'),
+                                     taille_bloc=10, requetes_par_seconde=None)
+        rapport = autre.executer(date(2023, 1, 1), date(2023, 1, 31), self.destination)
+
+        self.assertEqual(rapport['Repris'], 0)
+        self.assertEqual(len(ServeurHistorique.requetes), rapport['Blocs'])
+
+    def test_nouvelle_tentative_apres_erreur_transitoire(self):
+        """Test qu'une réponse 503 est réessayée après un délai exponentiel avec gigue"""
+        ServeurHistorique.indisponibles = {'2023-01-01..2023-01-07': 2}
+        delais = []
+        rattrapage = self._rattrapage(tentatives=3, delai_base=1.0, delai_max=1.5,
+                                      sommeil=delais.append, aleatoire=lambda: 0.5)
+
+        rapport = rattrapage.executer(date(2023, 1, 1), date(2023, 1, 10), self.destination)
+
+        self.assertEqual(rapport['Echecs'], {})
+        self.assertEqual(ServeurHistorique.requetes.count('2023-01-01..2023-01-07'), 3)
+        # 0.5 * min(1.5, 1.0 * 2^k) : le plafond s'applique à la deuxième attente
+        self.assertEqual(delais, [0.5, 0.75])
+
+    def test_fusion_remplace_la_periode_rattrapee(self):
+        """Test que la période rattrapée remplace les lignes existantes, y compris les jours de fermeture"""
+        existant = pd.DataFrame(
+            {'EUR_USD': [9.9, 9.9, 9.9, 9.9]},
+            index=pd.to_datetime([
+                '2024-12-19 10:57:57.180375',  # hors période : conservée telle quelle
+                '2024-12-23 10:57:57.180375',  # remplacée par le taux téléchargé
+                '2024-12-25 10:57:57.180375',  # Noël, BCE fermée : supprimée
+                '2025-01-03 10:57:57.180375',  # hors période : conservée telle quelle
+            ]),
+        )
+        existant.to_csv(self.destination)
+
+        self._rattrapage().executer(date(2024, 12, 20), date(2025, 1, 2), self.destination)
+        df = pd.read_csv(self.destination, index_col=0, parse_dates=True)
+
+        self.assertFalse(df.index.duplicated().any())
+        self.assertEqual(df.loc[pd.Timestamp('2024-12-19 10:57:57.180375'), 'EUR_USD'], 9.9)
+        self.assertEqual(df.loc[pd.Timestamp('2025-01-03 10:57:57.180375'), 'EUR_USD'], 9.9)
+        self.assertNotIn(pd.Timestamp('2024-12-23 10:57:57.180375'), df.index)
+        self.assertAlmostEqual(df.loc[pd.Timestamp('2024-12-23'), 'EUR_USD'], taux_du_jour(date(2024, 12, 23)))
+        for ferme in ('2024-12-25', '2024-12-26', '2025-01-01'):
+            self.assertFalse((df.index.normalize() == pd.Timestamp(ferme)).any())
+        # 20, 23, 24, 27, 30, 31 décembre et 2 janvier, plus les deux lignes hors période
+        self.assertEqual(len(df), 2 + 7)
+
+    def test_fusion_conserve_lignes_hors_periode(self):
+        """Test que les données infrajournalières hors période ne sont ni normalisées ni dédoublonnées"""
+        existant = pd.DataFrame(
+            {'EUR_USD': [1.10, 1.11, 1.12]},
+            index=pd.to_datetime(['2020-01-01 09:00', '2020-01-01 12:00', '2020-01-01 17:00']),
+        )
+        existant.to_csv(self.destination)
+        nouveau = pd.DataFrame({'EUR_USD': [1.07]}, index=pd.to_datetime(['2023-01-02']))
+
+        df = RattrapageHistorique.fusionner(nouveau, self.destination)
+
+        self.assertEqual(list(df.index[:3]), list(existant.index))
+        self.assertEqual(list(df['EUR_USD']), [1.10, 1.11, 1.12, 1.07])
+
+    def test_blocs_chevauchants_sans_doublon(self):
+        """Test qu'un jour renvoyé par deux blocs voisins n'apparaît qu'une fois"""
+        ServeurHistorique.recule_debut = True
+        # Le bloc 2023-01-08..2023-01-17 commence un dimanche : le serveur renvoie aussi le 6 janvier
+        rapport = self._rattrapage().executer(date(2023, 1, 1), date(2023, 1, 31), self.destination)
+        df = pd.read_csv(self.destination, index_col=0, parse_dates=True)
+
+        self.assertEqual(rapport['Echecs'], {})
+        self.assertFalse(df.index.duplicated().any())
+        self.assertEqual(len(df), len(pd.bdate_range('2023-01-01', '2023-01-31')))
+        self.assertAlmostEqual(df.loc[pd.Timestamp('2023-01-06'), 'EUR_USD'], taux_du_jour(date(2023, 1, 6)))
+
+    def test_fusion_dedoublonne_les_nouvelles_donnees(self):
+        """Test que des dates répétées dans les données téléchargées ne sont écrites qu'une fois"""
+        nouveau = pd.DataFrame({'EUR_USD': [1.0, 2.0]}, index=pd.to_datetime(['2024-12-20', '2024-12-20']))
+
+        df = RattrapageHistorique.fusionner(nouveau, self.destination)
+
+        self.assertEqual(list(df['EUR_USD']), [2.0])
+
+    def test_fusion_donnees_journalieres_sans_doublon(self):
+        """Test que des données journalières de part et d'autre ne produisent pas de doublon"""
+        existant = pd.DataFrame({'EUR_USD': [1.0, 1.0]}, index=pd.to_datetime(['2023-01-02', '2023-01-03']))
+        existant.to_csv(self.destination)
+        nouveau = pd.DataFrame({'EUR_USD': [2.0]}, index=pd.to_datetime(['2023-01-03']))
+
+        df = RattrapageHistorique.fusionner(nouveau, self.destination, periodes=[])
+
+        self.assertEqual(list(df['EUR_USD']), [1.0, 2.0])
+
+    def test_limiteur_debit(self):
+        """Test de l'espacement des requêtes par le limiteur"""
+        attentes = []
+        limiteur = LimiteurDebit(4, horloge=lambda: 100.0, sommeil=attentes.append)
+
+        for _ in range(3):
+            limiteur.attendre()
+
+        self.assertEqual(attentes, [0.25, 0.5])
+
+if __name__ == '__main__':
+    unittest.main()
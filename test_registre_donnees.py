@@ -0,0 +1,89 @@
+import unittest
+import pandas as pd
+import numpy as np
+import os
+import tempfile
+
+from registre_donnees import RegistreDonnees, obtenir_registre
+
+class TestRegistreDonnees(unittest.TestCase):
+    """Tests unitaires pour le registre de données partagé"""
+    
+    def setUp(self):
+        """Prépare un CSV temporaire"""
+        self.temp_csv = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
+        self.temp_csv.close()
+        self._ecrire([1.10, np.nan, 1.12, 1.13])
+        self.registre = RegistreDonnees(self.temp_csv.name, intervalle=0.05)
+    
+    def tearDown(self):
+        """Arrête la surveillance et nettoie"""
+        self.registre.arreter_surveillance()
+        if os.path.exists(self.temp_csv.name):
+            os.unlink(self.temp_csv.name)
+    
+    def _ecrire(self, taux, mtime=None):
+        """Écrit une série de taux dans le CSV temporaire"""
+        dates = pd.date_range(start='2023-01-01', periods=len(taux), freq='D')
+        pd.DataFrame({'EUR_USD': taux}, index=dates[::-1]).to_csv(self.temp_csv.name)
+        if mtime is not None:
+            os.utime(self.temp_csv.name, ns=(mtime, mtime))
+    
+    def test_chargement_et_preparation(self):
+        """Test du chargement : index trié, valeurs manquantes traitées"""
+        df = self.registre.dataframe()
+        
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertFalse(df['EUR_USD'].isna().any())
+        self.assertEqual(len(df), 4)
+    
+    def test_tampons_en_lecture_seule(self):
+        """Test que les tampons partagés ne sont pas modifiables"""
+        instantane = self.registre.instantane()
+        
+        self.assertFalse(instantane.valeurs.flags.writeable)
+        self.assertFalse(instantane.dates.flags.writeable)
+        with self.assertRaises(ValueError):
+            instantane.valeurs[0, 0] = 0.0
+    
+    def test_dataframes_partagent_la_memoire(self):
+        """Test que deux sessions lisent le même tampon sans copie"""
+        df1 = self.registre.dataframe()
+        df2 = self.registre.dataframe()
+        
+        self.assertTrue(np.shares_memory(df1['EUR_USD'].to_numpy(), df2['EUR_USD'].to_numpy()))
+    
+    def test_rechargement_si_contenu_modifie(self):
+        """Test du rechargement quand le contenu du fichier change"""
+        version = self.registre.instantane().version
+        self._ecrire([1.20, 1.21, 1.22, 1.23, 1.24], mtime=1_000_000_000_000_000_000)
+        
+        self.assertTrue(self.registre.verifier_modifications())
+        self.assertGreater(self.registre.instantane().version, version)
+        self.assertEqual(len(self.registre.dataframe()), 5)
+    
+    def test_pas_de_rechargement_si_fichier_seulement_touche(self):
+        """Test qu'un changement de date sans changement de contenu ne recharge pas"""
+        version = self.registre.instantane().version
+        os.utime(self.temp_csv.name, ns=(1_000_000_000_000_000_000,) * 2)
+        
+        self.assertFalse(self.registre.verifier_modifications())
+        self.assertEqual(self.registre.instantane().version, version)
+    
+    def test_rechargement_en_arriere_plan(self):
+        """Test que le thread de surveillance recharge le fichier modifié"""
+        self.registre.instantane()
+        self._ecrire([1.30, 1.31], mtime=1_000_000_000_000_000_000)
+        
+        for _ in range(100):
+            if len(self.registre.dataframe()) == 2:
+                break
+            self.registre._arret.wait(0.05)
+        self.assertEqual(len(self.registre.dataframe()), 2)
+    
+    def test_registre_unique_par_fichier(self):
+        """Test que le registre est partagé à l'échelle du processus"""
+        self.assertIs(obtenir_registre(self.temp_csv.name), obtenir_registre(self.temp_csv.name))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from registre_fournisseurs import AucunFournisseurDisponible, Fournisseur, RegistreFournisseurs
+
+class GestionnaireBouchon(BaseHTTPRequestHandler):
+    """Serveur local qui simule des fournisseurs sains, en panne ou lents"""
+
+    appels = {}
+
+    def do_GET(self):
+        GestionnaireBouchon.appels[self.path] = GestionnaireBouchon.appels.get(self.path, 0) + 1
+        if self.path == '/panne':
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == '/lent':
+            time.sleep(0.5)
+        corps = b'pas du json' if self.path == '/invalide' else json.dumps({'rates': {'USD': 1.0850}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, *args):
+        pass
+
+class TestRegistreFournisseurs(unittest.TestCase):
+    """Tests unitaires pour le routage adaptatif des fournisseurs"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Démarre le serveur bouchon"""
+        cls.serveur = ThreadingHTTPServer(('127.0.0.1', 0), GestionnaireBouchon)
+        cls.base = f"http://127.0.0.1:{cls.serveur.server_address[1]}"
+        threading.Thread(target=cls.serveur.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Arrête le serveur bouchon"""
+        cls.serveur.shutdown()
+        cls.serveur.server_close()
+
+    def setUp(self):
+        """Réinitialise les compteurs et l'horloge simulée"""
+        GestionnaireBouchon.appels = {}
+        self.maintenant = 1000.0
+        self.delais = []
+
+    def _fournisseur(self, chemin, timeout=2):
+        return Fournisseur(chemin.strip('/'), self.base + chemin, lambda data: data['rates']['USD'], timeout=timeout)
+
+    def _registre(self, chemins, **options):
+        return RegistreFournisseurs(
+            [self._fournisseur(c) for c in chemins],
+            horloge=lambda: self.maintenant,
+            sommeil=self.delais.append,
+            aleatoire=lambda: 0.5,
+            **options
+        )
+
+    def test_bascule_sur_fournisseur_sain(self):
+        """Test qu'une panne est réessayée puis contournée"""
+        registre = self._registre(['/panne', '/ok'], tentatives=3, seuil_ouverture=10)
+
+        taux, nom = registre.obtenir_taux()
+
+        self.assertEqual((taux, nom), (1.0850, 'ok'))
+        self.assertEqual(GestionnaireBouchon.appels['/panne'], 3)
+        # Délais exponentiels avec gigue : 0.5 * base * 2^k
+        self.assertEqual(self.delais, [0.25, 0.5])
+
+    def test_ordre_selon_sante_observee(self):
+        """Test que le fournisseur en échec passe après le fournisseur sain"""
+        registre = self._registre(['/panne', '/ok'], tentatives=1, seuil_ouverture=10)
+        registre.obtenir_taux()
+
+        self.assertEqual([f.nom for f in registre.ordonner()], ['ok', 'panne'])
+        registre.obtenir_taux()
+        self.assertEqual(GestionnaireBouchon.appels['/panne'], 1)
+
+    def test_ordre_selon_latence(self):
+        """Test que le fournisseur le plus rapide est préféré à santé égale"""
+        registre = self._registre(['/lent', '/ok'])
+        registre._enregistrer('lent', 0.5)
+        registre._enregistrer('ok', 0.01)
+
+        self.assertEqual([f.nom for f in registre.ordonner()], ['ok', 'lent'])
+
+    def test_disjoncteur(self):
+        """Test de l'ouverture, du semi-ouvert et de la fermeture du disjoncteur"""
+        registre = self._registre(['/panne'], tentatives=5, seuil_ouverture=2, duree_ouverture=60)
+
+        with self.assertRaises(AucunFournisseurDisponible):
+            registre.obtenir_taux()
+        # Le disjoncteur s'ouvre au deuxième échec et coupe les tentatives restantes
+        self.assertEqual(GestionnaireBouchon.appels['/panne'], 2)
+        self.assertEqual(registre.etat('panne'), 'ouvert')
+
+        with self.assertRaises(AucunFournisseurDisponible):
+            registre.obtenir_taux()
+        self.assertEqual(GestionnaireBouchon.appels['/panne'], 2)
+
+        # Après la durée d'ouverture, un seul essai est autorisé
+        self.maintenant += 61
+        self.assertEqual(registre.etat('panne'), 'semi-ouvert')
+        with self.assertRaises(AucunFournisseurDisponible):
+            registre.obtenir_taux()
+        self.assertEqual(GestionnaireBouchon.appels['/panne'], 3)
+        self.assertEqual(registre.etat('panne'), 'ouvert')
+
+        # Un succès referme le disjoncteur
+        self.maintenant += 61
+        registre.fournisseurs[0].url = self.base + '/ok'
+        self.assertEqual(registre.obtenir_taux()[1], 'panne')
+        self.assertEqual(registre.etat('panne'), 'ferme')
+
+    def test_timeout_compte_comme_echec(self):
+        """Test qu'un fournisseur trop lent est traité comme un échec transitoire"""
+        registre = RegistreFournisseurs(
+            [self._fournisseur('/lent', timeout=0.1), self._fournisseur('/ok')],
+            tentatives=2, sommeil=self.delais.append,
+        )
+
+        self.assertEqual(registre.obtenir_taux()[1], 'ok')
+        self.assertEqual(len(self.delais), 1)
+        self.assertEqual(registre.metriques()['lent']['Echecs'], 2)
+
+    def test_reponse_invalide_non_reessayee(self):
+        """Test qu'une réponse illisible n'est pas réessayée"""
+        registre = self._registre(['/invalide'], tentatives=3)
+
+        with self.assertRaises(AucunFournisseurDisponible) as contexte:
+            registre.obtenir_taux()
+
+        self.assertEqual(GestionnaireBouchon.appels['/invalide'], 1)
+        self.assertIn('invalide', contexte.exception.erreurs)
+
+    def test_metriques(self):
+        """Test des métriques exposées"""
+        registre = self._registre(['/ok'])
+        registre.obtenir_taux()
+        metriques = registre.metriques()['ok']
+
+        self.assertEqual(metriques['Appels'], 1)
+        self.assertEqual(metriques['Echecs'], 0)
+        self.assertEqual(metriques['Etat'], 'ferme')
+        self.assertGreater(metriques['Latence_Moyenne_ms'], 0)
+
+    def test_persistance_entre_demarrages(self):
+        """Test que la santé observée survit à un redémarrage"""
+        fichier = os.path.join(tempfile.mkdtemp(), 'etat.json')
+        registre = self._registre(['/panne', '/ok'], tentatives=1, seuil_ouverture=1, fichier_etat=fichier)
+        registre.obtenir_taux()
+
+        nouveau = self._registre(['/panne', '/ok'], seuil_ouverture=1, fichier_etat=fichier)
+
+        self.assertEqual(nouveau.etat('panne'), 'ouvert')
+        self.assertEqual([f.nom for f in nouveau.ordonner()], ['ok'])
+        os.unlink(fichier)
+
+if __name__ == '__main__':
+    unittest.main()